@@ -1,22 +1,47 @@
 from pathlib import Path
 import requests
-import json
 import os
 
+# Request bodies are always serialized to bytes, so requests sends them as-is.
+# The explicit data= body keeps the application/ld+json Content-Type.
+try:
+    import orjson
+    dumps = orjson.dumps
+    loads = orjson.loads
+except ImportError:
+    import json
+    loads = json.loads
+
+    def dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 BASEDIR = Path(__file__).parent
 broker = "http://localhost:1026"
 objects = BASEDIR.joinpath("items.json")
 
 url = broker + "/ngsi-ld/v1/entities/"
+batch_url = broker + "/ngsi-ld/v1/entityOperations/create"
 
 headers = {
   'Content-Type': 'application/ld+json'
 }
 
-with open(objects, 'r') as file:
-    objects = json.load(file)
+objects = loads(objects.read_bytes())
 
 print("NGSI-LD Post at " + broker)
-for payload in objects["items"]:
-    response = requests.request("POST", url, headers=headers, data=json.dumps(payload))
-    print(response.text)
\ No newline at end of file
+with requests.Session() as session:
+    # Create all entities with a single batch request
+    response = session.post(batch_url, headers=headers, data=dumps(objects["items"]))
+    print(response.status_code, response.text)
+
+    # On partial failure (207) or a rejected batch, replay the failed entities one by one
+    failed = []
+    if response.status_code == 207:
+        failed_ids = {error.get("entityId") for error in loads(response.content).get("errors", [])}
+        failed = [payload for payload in objects["items"] if payload.get("id") in failed_ids]
+    elif not response.ok:
+        failed = objects["items"]
+
+    for payload in failed:
+        response = session.post(url, headers=headers, data=dumps(payload))
+        print(response.status_code, response.text)
\ No newline at end of file
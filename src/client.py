@@ -1,12 +1,18 @@
 from openai import OpenAI
 import csv
-import json
+import io
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from serialization import loads
 client = OpenAI()
 
 MCP_SERVER_URL = "INSERT THE URL OF THE MCP SERVER"
+# Number of prompts evaluated concurrently. Defaults to 1 (serial) because
+# concurrent requests share the MCP server and the broker, which inflates the
+# recorded per-prompt latencies.
+MAX_WORKERS = int(os.environ.get("MCP_CLIENT_WORKERS", "1"))
 
 server_instructions = """
 You are interacting with a data space that stores objects of multiple types.
@@ -20,8 +26,8 @@ with located_in.
 """
 
 prompts_path = os.path.join(os.path.dirname(__file__), "prompts.json")
-with open(prompts_path, "r", encoding="utf-8") as file:
-    prompts = json.load(file)
+with open(prompts_path, "rb") as file:
+    prompts = loads(file.read())
 
 def _get_field(obj, name, default=None):
     if isinstance(obj, dict):
@@ -29,7 +35,9 @@ def _get_field(obj, name, default=None):
     return getattr(obj, name, default)
 
 
-writer = csv.writer(sys.stdout)
+# Buffered stdout so rows are written in blocks rather than one write per row
+output = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="", write_through=False)
+writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
 writer.writerow([
     "input",
     "output",
@@ -43,30 +51,46 @@ writer.writerow([
     "response_time_seconds"
 ])
 
-for prompt in prompts:
+def run_one(prompt):
     user_input = prompt["question"]
     expected_output = str(prompt["response"]).strip()
     start_time = time.perf_counter()
-    response = client.responses.create(
-        model="gpt-5.2",
-        input=user_input,
-        tools=[
-            {
-                "type": "mcp",
-                "server_label": "mcp",
-                "server_description": server_instructions,
-                "server_url": MCP_SERVER_URL,
-                "require_approval": "never",
-            }
-        ],
-    )
-    
+    try:
+        response = client.responses.create(
+            model="gpt-5.2",
+            input=user_input,
+            tools=[
+                {
+                    "type": "mcp",
+                    "server_label": "mcp",
+                    "server_description": server_instructions,
+                    "server_url": MCP_SERVER_URL,
+                    "require_approval": "never",
+                }
+            ],
+        )
+    except Exception as e:
+        # Record the failure and keep evaluating the remaining prompts
+        elapsed = time.perf_counter() - start_time
+        return [
+            user_input,
+            f"ERROR: {e}",
+            expected_output,
+            False,
+            None,
+            None,
+            None,
+            None,
+            None,
+            f"{elapsed:.3f}"
+        ]
+
     elapsed = time.perf_counter() - start_time
     output_text = (response.output_text or "").strip()
-    mcp_calls = [
-        item for item in (response.output or [])
+    mcp_calls = sum(
+        1 for item in (response.output or ())
         if _get_field(item, "type") == "mcp_call"
-    ]
+    )
     usage = response.usage or {}
     created_at = _get_field(response, "created_at")
     completed_at = _get_field(response, "completed_at")
@@ -77,7 +101,8 @@ for prompt in prompts:
             execution_time = (completed_at - created_at) / 1000.0 if completed_at > 1e12 else (completed_at - created_at)
         except TypeError:
             execution_time = None
-    writer.writerow([
+    #print(response.model_dump_json())
+    return [
         user_input,
         output_text,
         expected_output,
@@ -85,8 +110,15 @@ for prompt in prompts:
         _get_field(usage, "input_tokens"),
         _get_field(usage, "output_tokens"),
         _get_field(usage, "total_tokens"),
-        len(mcp_calls),
+        mcp_calls,
         execution_time,
         f"{elapsed:.3f}"
-    ])
-    #print(response.model_dump_json())
+    ]
+
+
+# With MAX_WORKERS > 1 the requests run concurrently; map() yields the rows in prompt order
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    for row in executor.map(run_one, prompts):
+        writer.writerow(row)
+
+output.flush()
@@ -1,16 +1,35 @@
 # server.py
 from fastmcp import FastMCP
 from typing import Annotated
-from pydantic import AnyHttpUrl
+from pydantic import Field
 import sys
 import requests
-import json
 import os
+import re
+import functools
+import copy
+from bisect import bisect_right
+from serialization import loads
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
  
 
 broker = "http://localhost:1026"
 
+_URL = broker + "/ngsi-ld/v1/entities/"
+_HEADERS = {
+    'Link':'<https://iot-data-space.github.io/context/context/mcp.jsonld>; rel="http://www.w3.org/ns/json-ld#context"; type="application/ld+json"'
+}
+
+# Shared session so that calls to the broker reuse pooled keep-alive connections.
+_session = requests.Session()
+_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=16))
+_session.headers.update(_HEADERS)
+
 server_instructions = """
 You are interacting with a data space. The data space contains objects of 
 different types. Each object has attributes relevant to its type. Objects include
@@ -21,42 +40,108 @@ mcp = FastMCP(name="IoTDataSpace",
         instructions=server_instructions)
 
 data_path = os.path.join(os.path.dirname(__file__), "..", "data-space", "data-space.json")
-with open(data_path, "r", encoding="utf-8") as file:
-    data_space = json.load(file)
+with open(data_path, "rb") as file:
+    data_space = loads(file.read())
+
+
+def _build_type_index(data_space: dict) -> tuple:
+    """
+    Build the type lookup structures once, as the data space is static.
+
+    Returns:
+        tuple: (types, search_text, text_owners, text_starts, all_text) where
+            types flattens the list of {type_name: type_data} entries into a single
+            dict, keeping the first definition of each type in data-space order;
+            search_text holds the lowercased type and attribute descriptions of each
+            type; all_text concatenates every search text so that an Aho-Corasick
+            automaton can scan all types in a single pass, and text_starts maps a
+            match offset back to its type in text_owners.
+    """
+    types = {}
+    for types_entry in data_space.get("data_space", {}).get("types", []):
+        for type_name, type_data in types_entry.items():
+            types.setdefault(type_name, type_data)
+
+    search_text = {}
+    for type_name, type_data in types.items():
+        descriptions = [str(type_data.get("description", "")).lower()]
+        descriptions.extend(
+            str(attribute.get("description", "")).lower()
+            for attribute in type_data.get("attributes", [])
+        )
+        # Descriptions are separated by NUL so a keyword never matches across two of them
+        search_text[type_name] = "\0".join(descriptions)
+
+    text_owners = list(search_text)
+    text_starts = []
+    offset = 0
+    for type_name in text_owners:
+        text_starts.append(offset)
+        offset += len(search_text[type_name]) + 1
+    all_text = "\0".join(search_text.values())
+
+    return types, search_text, text_owners, text_starts, all_text
+
+
+_TYPES, _SEARCH_TEXT, _TEXT_OWNERS, _TEXT_STARTS, _ALL_TEXT = _build_type_index(data_space)
+
+
+def _match_types(tokens: tuple) -> set:
+    if ahocorasick is None:
+        # Keywords may be partial words, so every type is scanned for substrings
+        return {
+            type_name
+            for type_name, text in _SEARCH_TEXT.items()
+            if any(token in text for token in tokens)
+        }
+
+    automaton = ahocorasick.Automaton()
+    for token in tokens:
+        automaton.add_word(token, token)
+    automaton.make_automaton()
+    return {
+        _TEXT_OWNERS[bisect_right(_TEXT_STARTS, end) - 1]
+        for end, _ in automaton.iter(_ALL_TEXT)
+    }
+
+
+def _present(value) -> bool:
+    # True for values other than None, "" and whitespace-only strings
+    return value is not None and value != "" and (not isinstance(value, str) or bool(value.strip()))
+
+
+@functools.lru_cache(maxsize=256)
+def _get_type_names(tokens: tuple) -> tuple:
+    # Cached on the normalized keywords; only the matched type names are stored,
+    # _get_types builds the result from them.
+    matched = _match_types(tokens)
+    return tuple(type_name for type_name in _TYPES if type_name in matched)
+
 
 def _get_types(keywords: str = None) -> list:
-    if keywords is None or str(keywords).strip() == "":
+    if not _present(keywords):
         return []
 
-    requested_attributes = [
+    requested_attributes = tuple(sorted({
         attr.strip().lower()
         for attr in keywords.split(",")
         if attr.strip()
-    ]
+    }))
     if not requested_attributes:
         return []
 
-    matches = []
-    seen = set()
-    types_entries = data_space.get("data_space", {}).get("types", [])
-    for types_entry in types_entries:
-        for type_name, type_data in types_entry.items():
-            type_description = str(type_data.get("description", "")).lower()
-            if any(token in type_description for token in requested_attributes):
-                if type_name not in seen:
-                    matches.append({type_name: type_data})
-                    seen.add(type_name)
-                continue
-            for attribute in type_data.get("attributes", []):
-                description = str(attribute.get("description", "")).lower()
-                if any(token in description for token in requested_attributes):
-                    if type_name not in seen:
-                        matches.append({type_name: type_data})
-                        seen.add(type_name)
-                    break
+    # Return copies so that a caller mutating the result cannot change _TYPES
+    return [
+        {type_name: copy.deepcopy(_TYPES[type_name])}
+        for type_name in _get_type_names(requested_attributes)
+    ]
+
 
-    return matches
 
+# Splits a filter such as "temperature >= 30" into attribute, operator and value.
+# The attribute is matched lazily, so the split happens at the first operator in
+# the filter; an attribute name therefore cannot itself contain an operator.
+_FILTER_RE = re.compile(r'^\s*(.+?)\s*(==|!=|<=|>=|<|>|contains)\s*(.*?)\s*$')
 
 
 def _read(type_id: str = None, object_id: str = None, 
@@ -65,8 +150,8 @@ def _read(type_id: str = None, object_id: str = None,
     Read objects from the data space with flexible filtering and attribute selection.
     
     Args:
-        type_id (str, optional): The type identifier to filter objects by type
-        object_id (str, optional): The object identifier to fetch a specific object
+        type_id (str, optional): The type identifier to filter objects by type, already stripped
+        object_id (str, optional): The object identifier to fetch a specific object, already stripped
         attributes (str, optional): A string composed of comma separated attributes
         filters (list, optional): List of filter strings in the form ["attribute operator value", ...]
                                   Examples: ["temperature>30", "located_in==building1", "consumption<=20"]
@@ -75,7 +160,11 @@ def _read(type_id: str = None, object_id: str = None,
     Returns:
         dict or list: A single object (if object_id provided) or a list of objects
     """
-    supported_operators = ["==", "!=", "<=", ">=", "<", ">", "contains"]
+    # Reject invalid requests before any work
+    if type_id and object_id:
+        return {"error": "Provide only one of type_id or object_id."}
+    if type_id and type_id not in _TYPES:
+        return {"error": f"Unknown type_id '{type_id}'."}
 
     def is_number(value):
         try:
@@ -91,18 +180,10 @@ def _read(type_id: str = None, object_id: str = None,
     if filters:
         normalized_filters = []
         for filter_str in filters:
-            attr = op = raw_value = None
-            for operator in supported_operators:
-                if operator in filter_str:
-                    parts = filter_str.split(operator, 1)
-                    if len(parts) == 2:
-                        attr = parts[0].strip()
-                        op = operator
-                        raw_value = parts[1].strip()
-                    break
-
-            if not op:
+            match = _FILTER_RE.match(filter_str)
+            if not match:
                 return {"error": f"Invalid filter '{filter_str}': unsupported operator"}
+            attr, op, raw_value = match.groups()
 
             value = raw_value
             if not is_number(value) and not is_quoted(value):
@@ -112,22 +193,19 @@ def _read(type_id: str = None, object_id: str = None,
 
         query = ";".join(normalized_filters)
 
-    url = broker + "/ngsi-ld/v1/entities/"
-    headers = {
-        'Link':'<https://iot-data-space.github.io/context/context/mcp.jsonld>; rel="http://www.w3.org/ns/json-ld#context"; type="application/ld+json"'
+    if not _present(attributes):
+        attributes = None
+    params = {
+        key: value
+        for key, value in (('type', type_id), ('id', object_id), ('q', query), ('attrs', attributes))
+        if value
     }
-    params = {}
-    if (type_id != None) and str(type_id).strip() != "":
-        params['type'] = type_id
-    if (object_id != None) and str(object_id).strip() != "":
-        params['id'] = object_id
-    if (query != None) and str(query).strip() != "":
-        params['q'] = query
-    if (attributes != None) and str(attributes).strip() != "":
-        params['attrs'] = attributes
     print(params)
-    response = requests.request("GET", url, headers=headers, params=params)
-    objects = json.loads(response.text)
+    response = _session.get(_URL, params=params)
+    # Parse the raw bytes directly; error bodies are not parsed at all
+    if not response.ok:
+        return {"error": f"{response.status_code} {response.reason}"}
+    objects = loads(response.content)
     return objects
 
 
@@ -139,7 +217,7 @@ def _read(type_id: str = None, object_id: str = None,
     type objects.
     """
 )
-def get_types(keywords: Annotated[str, "Comma-separated keywords to match against type and attribute descriptions (case-insensitive)."]) -> list:
+def get_types(keywords: Annotated[str, Field(description="Comma-separated keywords to match against type and attribute descriptions (case-insensitive).")]) -> list:
     print(f"get_types() called with: keywords={keywords}")
     result = _get_types(keywords)
     #print(f"get_types() response: {result}")
@@ -153,21 +231,17 @@ def get_types(keywords: Annotated[str, "Comma-separated keywords to match agains
     which attributes to include in the response. Leave attributes empty to return all fields.
     """
 )
-def read(type_id: Annotated[str, "The type identifier to filter objects by type"] = None,
-         object_id: Annotated[str, "The object identifier to fetch a specific object"] = None,
-         attributes: Annotated[str, "Comma-separated attribute names to include in the response; omit or empty for all."] = None,
-         filters: Annotated[list, """List of filter strings like ['attribute operator value', ...].
+def read(type_id: Annotated[str | None, Field(description="The type identifier to filter objects by type")] = None,
+         object_id: Annotated[str | None, Field(description="The object identifier to fetch a specific object")] = None,
+         attributes: Annotated[str | None, Field(description="Comma-separated attribute names to include in the response; omit or empty for all.")] = None,
+         filters: Annotated[list[str] | None, Field(description="""List of filter strings like ['attribute operator value', ...].
                                      Examples: ['temperature>30', 'located_in==building1', 'consumption<=20'].
-                                     Operators: ==, !=, <, <=, >, >=, contains (values may be quoted)."""] = None)-> list:
+                                     Operators: ==, !=, <, <=, >, >=, contains (values may be quoted).""")] = None) -> list | dict:
 
     print(f"read() called with: type_id={type_id}, object_id={object_id}, attributes={attributes}, filters={filters}")
-    if (type_id is not None and str(type_id).strip() != "") and (object_id is not None and str(object_id).strip() != ""):
-        return {"error": "Provide only one of type_id or object_id."}
-    if type_id is not None and str(type_id).strip() != "":
-        types_entries = data_space.get("data_space", {}).get("types", [])
-        type_exists = any(type_id in entry for entry in types_entries)
-        if not type_exists:
-            return {"error": f"Unknown type_id '{type_id}'."}
+    # Normalize the identifiers once; empty values become None
+    type_id = (type_id.strip() or None) if isinstance(type_id, str) else None
+    object_id = (object_id.strip() or None) if isinstance(object_id, str) else None
     result = _read(type_id=type_id, object_id=object_id, attributes=attributes, filters=filters)
     #print(f"read() response: {result}")
     return result
@@ -0,0 +1,10 @@
+# serialization.py
+# Thin JSON parsing wrapper: uses orjson when available, falls back to the stdlib.
+import json
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+loads = _orjson.loads if _orjson is not None else json.loads